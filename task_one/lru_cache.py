@@ -1,150 +1,240 @@
+import array
 import random
 import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from itertools import repeat
+
+# Configuration
+N = 100_000  # array size
+Q = 50_000  # number of queries
+CAPACITY = 1000  # cache capacity
+
+# Query opcodes
+RANGE = 0
+UPDATE = 1
+
+# Returned by LRUCache.get for absent keys
+_MISS = object()
 
 
 class LRUCache:
-    """LRU Cache implementation using doubly linked list and hash map."""
+    """LRU Cache implementation using an ordered hash map.
 
-    class Node:
-        def __init__(self, key, value):
-            self.key = key
-            self.value = value
-            self.prev = None
-            self.next = None
+    Keys encode (left, right) ranges over an array of the given size as
+    the single int left * size + right (see range_key). Two sorted
+    endpoint lists are kept alongside the hash map so that the ranges
+    covering an index can be found without scanning every cached key.
+    """
 
-    def __init__(self, capacity: int):
+    __slots__ = ("capacity", "size", "cache", "by_left", "by_right")
+
+    def __init__(self, capacity: int, size: int):
         self.capacity = capacity
-        self.cache = {}  # key -> Node
-        # Dummy head and tail
-        self.head = self.Node(0, 0)
-        self.tail = self.Node(0, 0)
-        self.head.next = self.tail
-        self.tail.prev = self.head
-
-    def _remove(self, node):
-        """Remove node from linked list."""
-        prev_node = node.prev
-        next_node = node.next
-        prev_node.next = next_node
-        next_node.prev = prev_node
-
-    def _add_to_head(self, node):
-        """Add node right after head."""
-        node.prev = self.head
-        node.next = self.head.next
-        self.head.next.prev = node
-        self.head.next = node
+        self.size = size
+        # key -> value, ordered from least to most recently used
+        self.cache = OrderedDict()
+        # Interval index: keys (ordered by left, then right) and the same
+        # ranges encoded as right * size + left
+        self.by_left = []
+        self.by_right = []
 
     def get(self, key):
-        """Get value by key. Returns -1 if key doesn't exist."""
-        if key in self.cache:
-            node = self.cache[key]
-            # Move to head (most recently used)
-            self._remove(node)
-            self._add_to_head(node)
-            return node.value
-        return -1
+        """Get value by key. Returns _MISS if key doesn't exist."""
+        cache = self.cache
+        value = cache.get(key, _MISS)
+        if value is not _MISS:
+            # Mark as most recently used
+            cache.move_to_end(key)
+        return value
 
     def put(self, key, value):
         """Put key-value pair into cache."""
-        if key in self.cache:
+        cache = self.cache
+        if key in cache:
             # Update existing
-            node = self.cache[key]
-            node.value = value
-            self._remove(node)
-            self._add_to_head(node)
-        else:
-            # Add new
-            node = self.Node(key, value)
-            self.cache[key] = node
-            self._add_to_head(node)
-
-            if len(self.cache) > self.capacity:
-                # Remove LRU (tail.prev)
-                lru = self.tail.prev
-                self._remove(lru)
-                del self.cache[lru.key]
+            cache.move_to_end(key)
+            cache[key] = value
+            return
+
+        # Add new and register it in the interval index
+        cache[key] = value
+        size = self.size
+        left, right = divmod(key, size)
+        by_left = self.by_left
+        by_right = self.by_right
+        insort(by_left, key)
+        insort(by_right, right * size + left)
+
+        if len(cache) > self.capacity:
+            # Remove LRU (first item) from cache and index
+            lru_key, _ = cache.popitem(last=False)
+            left, right = divmod(lru_key, size)
+            del by_left[bisect_left(by_left, lru_key)]
+            del by_right[bisect_left(by_right, right * size + left)]
+
+    def covering(self, index):
+        """Return keys of all cached ranges with left <= index <= right."""
+        size = self.size
+        # Ranges starting at or before index
+        n_left = bisect_right(self.by_left, index * size + size - 1)
+        # Ranges ending at or after index
+        start = bisect_left(self.by_right, index * size)
+        n_right = len(self.by_right) - start
+
+        # Walk the smaller side and check the other endpoint
+        if n_left <= n_right:
+            return [key for key in self.by_left[:n_left] if key % size >= index]
+        return [
+            left * size + right
+            for right, left in map(divmod, self.by_right[start:], repeat(size))
+            if left <= index
+        ]
 
     def keys(self):
         """Return all keys in cache."""
         return list(self.cache.keys())
 
 
+class FenwickTree:
+    """Binary indexed tree over prefix sums of an integer array."""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, array):
+        n = len(array)
+        self.tree = [0] + list(array)
+        # Linear-time build: push each node into its parent
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index, delta):
+        """Add delta to the element at index."""
+        tree = self.tree
+        n = len(tree)
+        i = index + 1
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        """Return the sum of the first count elements."""
+        tree = self.tree
+        total = 0
+        i = count
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, left, right):
+        """Return the sum of elements in [left, right]."""
+        return self.prefix_sum(right + 1) - self.prefix_sum(left)
+
+
 # Initialize global cache
-cache = LRUCache(capacity=1000)
+cache = LRUCache(capacity=CAPACITY, size=N)
+
 
+def range_key(left, right, size):
+    """Encode range [left, right] of an array of given size as one int."""
+    return left * size + right
 
-def range_sum_no_cache(array, left, right):
-    """Calculate sum without caching."""
-    return sum(array[left : right + 1])
+
+def _cache_for(array):
+    """Return the global cache, rebuilt if it was sized for another array."""
+    global cache
+    if cache.size != len(array):
+        cache = LRUCache(capacity=CAPACITY, size=len(array))
+    return cache
 
 
-def update_no_cache(array, index, value):
-    """Update element without caching."""
+def range_sum_no_cache(prefix, left, right):
+    """Calculate sum without caching using prefix sums."""
+    return prefix.range_sum(left, right)
+
+
+def update_no_cache(array, prefix, index, value):
+    """Update element without caching and patch prefix sums."""
+    delta = value - array[index]
     array[index] = value
+    prefix.add(index, delta)
 
 
-def range_sum_with_cache(array, left, right):
-    """Calculate sum with LRU cache."""
-    key = (left, right)
-    result = cache.get(key)
+def range_sum_with_cache(array, key):
+    """Calculate sum of the range encoded by key with LRU cache.
 
-    if result == -1:  # Cache miss
+    key must come from range_key(left, right, len(array)).
+    """
+    lru = _cache_for(array)
+    result = lru.get(key)
+
+    if result is _MISS:  # Cache miss
+        left, right = divmod(key, lru.size)
         result = sum(array[left : right + 1])
-        cache.put(key, result)
+        lru.put(key, result)
 
     return result
 
 
 def update_with_cache(array, index, value):
-    """Update element and invalidate affected cache entries."""
+    """Update element and patch affected cache entries in place."""
+    delta = value - array[index]
     array[index] = value
+    if not delta:
+        return
 
-    # Invalidate all ranges that contain the updated index
-    keys_to_remove = []
-    for key in cache.keys():
-        left, right = key
-        if left <= index <= right:
-            keys_to_remove.append(key)
-
-    # Remove invalidated entries
-    for key in keys_to_remove:
-        cache.cache.pop(key, None)
+    # Shift the cached sums of ranges that contain the updated index;
+    # plain assignment keeps their LRU position
+    lru = _cache_for(array)
+    entries = lru.cache
+    for key in lru.covering(index):
+        entries[key] += delta
 
 
 def make_queries(n, q, hot_pool=30, p_hot=0.95, p_update=0.03):
-    """Generate query list with hot ranges."""
+    """Generate query list with hot ranges.
+
+    Queries are (UPDATE, index, value) or (RANGE, range_key(left, right,
+    n), None); every query on the same hot range shares one key object,
+    so cache lookups reuse it.
+    """
+    # Bind the generator once; int(rand() * k) is uniform over range(k)
+    # without the per-call overhead of randint/choice
+    rand = random.random
+    half = n // 2
     hot = [
-        (random.randint(0, n // 2), random.randint(n // 2, n - 1))
+        range_key(int(rand() * (half + 1)), half + int(rand() * (n - half)), n)
         for _ in range(hot_pool)
     ]
     queries = []
+    append = queries.append
     for _ in range(q):
-        if random.random() < p_update:  # ~3% queries are Update
-            idx = random.randint(0, n - 1)
-            val = random.randint(1, 100)
-            queries.append(("Update", idx, val))
-        else:  # ~97% are Range
-            if random.random() < p_hot:  # 95% are "hot" ranges
-                left, right = random.choice(hot)
-            else:  # 5% are random ranges
-                left = random.randint(0, n - 1)
-                right = random.randint(left, n - 1)
-            queries.append(("Range", left, right))
+        if rand() < p_update:  # ~3% queries are Update
+            append((UPDATE, int(rand() * n), 1 + int(rand() * 100)))
+        elif rand() < p_hot:  # 95% of Range queries are "hot" ranges
+            append((RANGE, hot[int(rand() * hot_pool)], None))
+        else:  # 5% are random ranges
+            left = int(rand() * n)
+            key = range_key(left, left + int(rand() * (n - left)), n)
+            append((RANGE, key, None))
     return queries
 
 
 def test_without_cache(array, queries):
     """Execute queries without cache."""
+    prefix = FenwickTree(array)
+    size = len(array)
+
     total = 0
-    for query in queries:
-        if query[0] == "Update":
-            _, index, value = query
-            update_no_cache(array, index, value)
-        else:  # Range
-            _, left, right = query
-            result = range_sum_no_cache(array, left, right)
-            total += result
+    for op, a, b in queries:
+        if op == UPDATE:  # a = index, b = value
+            update_no_cache(array, prefix, a, b)
+        else:  # Range: a = key
+            left, right = divmod(a, size)
+            total += range_sum_no_cache(prefix, left, right)
     return total
 
 
@@ -152,46 +242,50 @@ def test_with_cache(array, queries):
     """Execute queries with LRU cache."""
     # Reset cache
     global cache
-    cache = LRUCache(capacity=1000)
+    cache = LRUCache(capacity=CAPACITY, size=len(array))
+
+    # Bind cache methods to locals once for the hot loop
+    cache_get = cache.get
+    cache_put = cache.put
+    size = cache.size
 
     total = 0
-    for query in queries:
-        if query[0] == "Update":
-            _, index, value = query
-            update_with_cache(array, index, value)
-        else:  # Range
-            _, left, right = query
-            result = range_sum_with_cache(array, left, right)
+    for op, a, b in queries:
+        if op == UPDATE:  # a = index, b = value
+            update_with_cache(array, a, b)
+        else:  # Range: a = key, inlined range_sum_with_cache
+            result = cache_get(a)
+            if result is _MISS:  # Cache miss
+                left, right = divmod(a, size)
+                result = sum(array[left : right + 1])
+                cache_put(a, result)
             total += result
     return total
 
 
 def main():
-    # Configuration
-    N = 100_000
-    Q = 50_000
-
     print("=== LRU Cache Optimization Demo ===\n")
     print(f"Array size: {N:,}")
     print(f"Number of queries: {Q:,}")
-    print(f"Cache capacity: 1,000\n")
+    print(f"Cache capacity: {CAPACITY:,}\n")
 
     # Generate test data
     print("Generating test data...")
-    array_original = [random.randint(1, 100) for _ in range(N)]
+    # Contiguous int64 buffer instead of a list of object pointers
+    array_original = array.array("q", (random.randint(1, 100) for _ in range(N)))
     queries = make_queries(N, Q)
     print(f"Generated {len(queries):,} queries\n")
 
     # Test without cache
     print("Testing without cache...")
-    array_no_cache = array_original.copy()
+    array_no_cache = array_original[:]
     start_time = time.time()
     result_no_cache = test_without_cache(array_no_cache, queries)
     time_no_cache = time.time() - start_time
 
     # Test with cache
     print("Testing with LRU cache...")
-    array_with_cache = array_original.copy()
+    array_with_cache = array_original[:]
     start_time = time.time()
     result_with_cache = test_with_cache(array_with_cache, queries)
     time_with_cache = time.time() - start_time
@@ -1,10 +1,33 @@
 import random
-from typing import Dict
+from heapq import heappop, heappush
+from typing import Dict, List, Optional, Tuple
 import time
-from collections import deque
+from time import monotonic as _now
+
+
+class TimestampRing:
+    """Fixed-size ring buffer of request timestamps, oldest at head."""
+
+    __slots__ = ("times", "head", "count")
+
+    def __init__(self, size: int):
+        self.times = [0.0] * size
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp: float) -> None:
+        """Store timestamp after the newest one (buffer must not be full)."""
+        self.times[(self.head + self.count) % len(self.times)] = timestamp
+        self.count += 1
+
+    def oldest(self) -> float:
+        """Return the oldest stored timestamp."""
+        return self.times[self.head]
 
 
 class SlidingWindowRateLimiter:
+    __slots__ = ("window_size", "max_requests", "user_windows", "_expiries")
+
     def __init__(self, window_size: int = 10, max_requests: int = 1):
         """
         Initialize rate limiter with sliding window algorithm.
@@ -15,30 +38,45 @@ class SlidingWindowRateLimiter:
         """
         self.window_size = window_size
         self.max_requests = max_requests
-        # Dictionary to store deque of timestamps for each user
-        self.user_windows: Dict[str, deque] = {}
-
-    def _cleanup_window(self, user_id: str, current_time: float) -> None:
+        # Dictionary to store a ring buffer of timestamps for each user
+        self.user_windows: Dict[str, TimestampRing] = {}
+        # Min-heap of (timestamp, user_id) for every active request
+        self._expiries: List[Tuple[float, str]] = []
+
+    def _cleanup_window(
+        self, user_id: str, current_time: float
+    ) -> Optional[TimestampRing]:
         """
-        Clean up expired requests from the user's window.
+        Clean up expired requests from all users' windows.
+
+        Expired timestamps are popped from the shared heap in time order,
+        so users who stop sending are dropped without calling in again.
 
         Args:
             user_id: User identifier
-            current_time: Current timestamp
-        """
-        if user_id not in self.user_windows:
-            return
+            current_time: Current timestamp from the monotonic clock
 
-        window = self.user_windows[user_id]
+        Returns:
+            The user's window, or None if the user has no active requests
+        """
+        expiries = self._expiries
+        user_windows = self.user_windows
         cutoff_time = current_time - self.window_size
 
-        # Remove all timestamps older than window_size
-        while window and window[0] <= cutoff_time:
-            window.popleft()
+        # Remove all timestamps older than window_size; a user's oldest
+        # timestamp always expires first, so it is at the ring head
+        while expiries and expiries[0][0] <= cutoff_time:
+            _, expired_user = heappop(expiries)
+            window = user_windows[expired_user]
+            window.count -= 1
 
-        # If window is empty, remove user from dictionary
-        if not window:
-            del self.user_windows[user_id]
+            # If window is empty, remove user from dictionary
+            if not window.count:
+                del user_windows[expired_user]
+            else:
+                window.head = (window.head + 1) % len(window.times)
+
+        return user_windows.get(user_id)
 
     def can_send_message(self, user_id: str) -> bool:
         """
@@ -50,15 +88,14 @@ class SlidingWindowRateLimiter:
         Returns:
             True if user can send message, False otherwise
         """
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
+        window = self._cleanup_window(user_id, _now())
 
         # First message from user is always allowed
-        if user_id not in self.user_windows:
+        if window is None:
             return True
 
         # Check if user has reached the limit
-        return len(self.user_windows[user_id]) < self.max_requests
+        return window.count < self.max_requests
 
     def record_message(self, user_id: str) -> bool:
         """
@@ -70,19 +107,21 @@ class SlidingWindowRateLimiter:
         Returns:
             True if message was recorded, False if rate limit exceeded
         """
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
-
-        # Check if user can send message
-        if not self.can_send_message(user_id):
+        current_time = _now()
+        window = self._cleanup_window(user_id, current_time)
+
+        if window is None:
+            # Initialize window for new user; the first message is always
+            # allowed, so keep at least one slot
+            window = TimestampRing(max(self.max_requests, 1))
+            self.user_windows[user_id] = window
+        elif window.count >= self.max_requests:
+            # User has reached the limit
             return False
 
-        # Initialize window for new user
-        if user_id not in self.user_windows:
-            self.user_windows[user_id] = deque()
-
         # Record the message
-        self.user_windows[user_id].append(current_time)
+        window.append(current_time)
+        heappush(self._expiries, (current_time, user_id))
         return True
 
     def time_until_next_allowed(self, user_id: str) -> float:
@@ -95,20 +134,15 @@ class SlidingWindowRateLimiter:
         Returns:
             Time in seconds until next message is allowed (0 if can send now)
         """
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
+        current_time = _now()
+        window = self._cleanup_window(user_id, current_time)
 
         # User can send immediately if not in dictionary or below limit
-        if user_id not in self.user_windows:
-            return 0.0
-
-        window = self.user_windows[user_id]
-
-        if len(window) < self.max_requests:
+        if window is None or window.count < self.max_requests:
             return 0.0
 
         # Calculate time until oldest message expires
-        oldest_message_time = window[0]
+        oldest_message_time = window.oldest()
         time_until_expired = (oldest_message_time + self.window_size) - current_time
         return max(0.0, time_until_expired)
 